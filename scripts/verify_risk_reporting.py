@@ -0,0 +1,192 @@
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from model import Session, Customer, RiskEvent, RiskEventDailySummary, CustomerRiskDailySummary, CustomerRiskSummary
+from sqlalchemy import and_, or_, func, case, text
+from risk_reporting import (
+    refresh_risk_rollups, violations_per_day, violations_by_event_type,
+    unresolved_counts, customer_violations, top_customers
+)
+
+# Checks that incremental refreshes match a GROUP BY over risk_events and times the dashboard queries.
+# It only creates, edits and deletes its own probe customer and events; existing rows are never touched.
+# The probe customer (and, by cascade, its events) is always deleted at the end, even on failure.
+
+def create_probe_customer(session):
+    customer = Customer(
+        customer_id=uuid.uuid4(),
+        citizen_id=''.join(random.choices('0123456789', k=12)),
+        full_name='Risk Reporting Probe',
+        dob=date(1990, 1, 1),
+        phone_number='0900000000',
+    )
+    session.add(customer)
+    session.commit()
+    return customer.customer_id
+
+def add_probe_event(session, customer_id, created_at, event_type='failed_auth'):
+    event = RiskEvent(
+        event_id=uuid.uuid4(),
+        customer_id=customer_id,
+        event_type=event_type,
+        description='verify_risk_reporting probe',
+        created_at=created_at,
+    )
+    session.add(event)
+    return event
+
+def expected_rollups(session, dates, customer_id):
+    event_date = func.date(RiskEvent.created_at)
+    unresolved = func.sum(case((RiskEvent.resolved_at == None, 1), else_=0))
+    in_dates = or_(*[
+        and_(RiskEvent.created_at >= day, RiskEvent.created_at < day + timedelta(days=1))
+        for day in dates
+    ])
+    by_type = set(
+        session.query(event_date, RiskEvent.event_type, func.count(), unresolved)
+        .filter(in_dates)
+        .group_by(event_date, RiskEvent.event_type)
+        .all()
+    )
+    by_customer = set(
+        session.query(RiskEvent.customer_id, event_date, func.count(), unresolved)
+        .filter(in_dates)
+        .group_by(RiskEvent.customer_id, event_date)
+        .all()
+    )
+    totals = set(
+        session.query(RiskEvent.customer_id, func.count(), unresolved)
+        .filter(RiskEvent.customer_id == customer_id, RiskEvent.created_at != None)
+        .group_by(RiskEvent.customer_id)
+        .all()
+    )
+    return by_type, by_customer, totals
+
+def actual_rollups(session, dates, customer_id):
+    by_type = set(
+        session.query(
+            RiskEventDailySummary.summary_date, RiskEventDailySummary.event_type,
+            RiskEventDailySummary.event_count, RiskEventDailySummary.unresolved_count
+        )
+        .filter(RiskEventDailySummary.summary_date.in_(dates))
+        .all()
+    )
+    by_customer = set(
+        session.query(
+            CustomerRiskDailySummary.customer_id, CustomerRiskDailySummary.summary_date,
+            CustomerRiskDailySummary.event_count, CustomerRiskDailySummary.unresolved_count
+        )
+        .filter(CustomerRiskDailySummary.summary_date.in_(dates))
+        .all()
+    )
+    totals = set(
+        session.query(
+            CustomerRiskSummary.customer_id, CustomerRiskSummary.event_count, CustomerRiskSummary.unresolved_count
+        )
+        .filter(CustomerRiskSummary.customer_id == customer_id)
+        .all()
+    )
+    return by_type, by_customer, totals
+
+def compare_rollups(session, step, dates, customer_id):
+    # Only the probe's days are compared, so the check stays cheap on a large risk_events table
+    refresh_risk_rollups(session)
+    expected = expected_rollups(session, dates, customer_id)
+    actual = actual_rollups(session, dates, customer_id)
+    ok = expected == actual
+    print(f"[VERIFY] {step}: {'OK' if ok else 'MISMATCH'}")
+    if not ok:
+        for name, exp, act in zip(['(date, event_type)', '(customer_id, date)', 'customer totals'], expected, actual):
+            print(f"  {name} missing: {list(exp - act)[:3]}, extra: {list(act - exp)[:3]}")
+    return ok
+
+def verify_incremental_refresh(session):
+    today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    old_day = today - timedelta(days=40)
+    dates = [today.date(), old_day.date()]
+    results = []
+
+    customer_id = create_probe_customer(session)
+    try:
+        results.append(compare_rollups(session, 'initial refresh', dates, customer_id))
+
+        # Round 1: new events today and on an older day
+        events = [
+            add_probe_event(session, customer_id, today),
+            add_probe_event(session, customer_id, today, 'device_change'),
+            add_probe_event(session, customer_id, today),
+            add_probe_event(session, customer_id, old_day),
+        ]
+        session.commit()
+        results.append(compare_rollups(session, 'new events', dates, customer_id))
+
+        # Round 2: resolved events and a deleted event
+        events[0].resolved_at = datetime.now()
+        events[3].resolved_at = datetime.now()
+        session.delete(events[2])
+        session.commit()
+        results.append(compare_rollups(session, 'resolved + deleted events', dates, customer_id))
+
+        # Round 3: a reopened event and a resolved_at backdated before the last refresh
+        events[0].resolved_at = None
+        events[1].resolved_at = old_day
+        session.commit()
+        results.append(compare_rollups(session, 'reopened + backdated events', dates, customer_id))
+    finally:
+        session.rollback()
+        # Deleting the probe customer cascades to its events and rollup rows
+        session.query(Customer).filter(Customer.customer_id == customer_id).delete(synchronize_session=False)
+        session.commit()
+    results.append(compare_rollups(session, 'probe removed', dates, customer_id))
+    return all(results)
+
+def explain(session, query):
+    sql = str(query.statement.compile(session.bind, compile_kwargs={'literal_binds': True}))
+    for row in session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")):
+        print(f"    {row[0]}")
+    session.rollback()
+
+def time_dashboard_queries(session):
+    print("\n[VERIFY] Dashboard query timings (on this database's data volume)")
+    today = datetime.now().date()
+    start = today - timedelta(days=30)
+    customer_id = session.query(CustomerRiskSummary.customer_id).limit(1).scalar()
+    queries = [
+        ('violations_per_day (30 days)', lambda: violations_per_day(session, start, today)),
+        ('violations_by_event_type (30 days)', lambda: violations_by_event_type(session, start, today)),
+        ('unresolved_counts (all time)', lambda: unresolved_counts(session)),
+        ('customer_violations', lambda: customer_violations(session, customer_id)),
+        ('top_customers (all time)', lambda: top_customers(session)),
+        ('top_customers (30 days)', lambda: top_customers(session, start, today)),
+    ]
+    for name, run in queries:
+        started = time.perf_counter()
+        run()
+        print(f"  {name}: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    print("\n[VERIFY] Query plans")
+    print("  top_customers (all time):")
+    explain(session, session.query(CustomerRiskSummary.customer_id, CustomerRiskSummary.event_count)
+            .order_by(CustomerRiskSummary.event_count.desc()).limit(10))
+    print("  customer_violations:")
+    explain(session, session.query(CustomerRiskDailySummary).filter(CustomerRiskDailySummary.customer_id == customer_id))
+
+
+def main():
+    session = Session()
+    try:
+        ok = verify_incremental_refresh(session)
+        time_dashboard_queries(session)
+    finally:
+        session.close()
+    if not ok:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
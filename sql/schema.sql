@@ -1,5 +1,9 @@
 -- Drop all tables
 DROP TABLE IF EXISTS 
+  risk_event_changes,
+  customer_risk_summary,
+  customer_risk_daily_summary,
+  risk_event_daily_summary,
   daily_transaction_summary,
   risk_events, 
   transactions, 
@@ -162,6 +166,43 @@ CREATE TABLE daily_transaction_summary (
     FOREIGN KEY (customer_id) REFERENCES customers(customer_id) ON DELETE CASCADE
 );
 
+-- Risk reporting rollups: pre-aggregated risk_events for dashboard queries
+-- Refreshed incrementally by src/risk_reporting.py after each monitoring_audit run
+CREATE TABLE risk_event_daily_summary (
+    summary_date DATE NOT NULL,
+    event_type risk_event_enum NOT NULL,
+    event_count INTEGER DEFAULT 0,
+    unresolved_count INTEGER DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (summary_date, event_type)
+);
+
+CREATE TABLE customer_risk_daily_summary (
+    customer_id UUID NOT NULL,
+    summary_date DATE NOT NULL,
+    event_count INTEGER DEFAULT 0,
+    unresolved_count INTEGER DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (customer_id, summary_date),
+    FOREIGN KEY (customer_id) REFERENCES customers(customer_id) ON DELETE CASCADE
+);
+
+-- All-time totals per customer, kept in step with customer_risk_daily_summary for top-N queries
+CREATE TABLE customer_risk_summary (
+    customer_id UUID PRIMARY KEY,
+    event_count INTEGER DEFAULT 0,
+    unresolved_count INTEGER DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (customer_id) REFERENCES customers(customer_id) ON DELETE CASCADE
+);
+
+-- Change log of risk_events days whose rollup rows are stale, one row per day
+-- Consumed (and emptied) by each rollup refresh
+CREATE TABLE risk_event_changes (
+    summary_date DATE PRIMARY KEY,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Trigger to update daily transaction summary
 -- This trigger will update the daily transaction summary table whenever a new transaction is inserted
 CREATE OR REPLACE FUNCTION update_daily_transaction_summary()
@@ -217,9 +258,54 @@ CREATE TRIGGER trg_update_daily_transaction_summary
   AFTER INSERT ON transactions
   FOR EACH ROW
   EXECUTE FUNCTION update_daily_transaction_summary();
+
+-- Triggers to log changed days on risk_events
+-- Statement-level with transition tables, so a bulk insert/resolve/delete logs each day once
+-- Covers new events, resolved/reopened events, created_at edits and deletes (including customer cascades)
+CREATE OR REPLACE FUNCTION log_risk_event_changes()
+RETURNS TRIGGER AS $$
+BEGIN
+  -- DO UPDATE (not DO NOTHING) locks the day's row, so a refresh deleting it waits for this
+  -- transaction and then aggregates its events, instead of dropping the change
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO risk_event_changes (summary_date)
+    SELECT DISTINCT created_at::date FROM new_events WHERE created_at IS NOT NULL
+    ON CONFLICT (summary_date) DO UPDATE SET changed_at = CURRENT_TIMESTAMP;
+  END IF;
+
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    INSERT INTO risk_event_changes (summary_date)
+    SELECT DISTINCT created_at::date FROM old_events WHERE created_at IS NOT NULL
+    ON CONFLICT (summary_date) DO UPDATE SET changed_at = CURRENT_TIMESTAMP;
+  END IF;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE TRIGGER trg_log_risk_event_insert
+  AFTER INSERT ON risk_events
+  REFERENCING NEW TABLE AS new_events
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION log_risk_event_changes();
+
+CREATE TRIGGER trg_log_risk_event_update
+  AFTER UPDATE ON risk_events
+  REFERENCING OLD TABLE AS old_events NEW TABLE AS new_events
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION log_risk_event_changes();
+
+CREATE TRIGGER trg_log_risk_event_delete
+  AFTER DELETE ON risk_events
+  REFERENCING OLD TABLE AS old_events
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION log_risk_event_changes();
 -- Indexes
 CREATE INDEX idx_transactions_customer ON transactions(customer_id);
 CREATE INDEX idx_transactions_account ON transactions(account_id);
 CREATE INDEX idx_accounts_customer ON bank_accounts(customer_id);
 CREATE INDEX idx_devices_customer ON devices(customer_id);
-
+CREATE INDEX idx_risk_events_created_at ON risk_events(created_at);
+CREATE INDEX idx_customer_risk_summary_date ON customer_risk_daily_summary(summary_date);
+CREATE INDEX idx_customer_risk_summary_event_count ON customer_risk_summary(event_count DESC);
@@ -50,4 +50,11 @@ with DAG(
         on_failure_callback=alert_on_failure,
     )
 
-    generate_data >> dq_standards >> monitoring_audit 
\ No newline at end of file
+    risk_reporting = BashOperator(
+        task_id='risk_reporting',
+        bash_command='python src/risk_reporting.py',
+        do_xcom_push=False,
+        on_failure_callback=alert_on_failure,
+    )
+
+    generate_data >> dq_standards >> monitoring_audit >> risk_reporting 
\ No newline at end of file
@@ -25,6 +25,9 @@ Base = declarative_base()
 fake = Faker('vi_VN')
 
 # === ORM Models ===
+# Shared by risk_events and its reporting rollups so event types are defined once
+risk_event_enum = Enum('high_value_transaction', 'unusual_pattern', 'device_change', 'location_mismatch', 'failed_auth', name='risk_event_enum')
+
 class Customer(Base):
     __tablename__ = 'customers'
     customer_id = Column(UUID(as_uuid=True), primary_key=True)
@@ -131,7 +134,35 @@ class RiskEvent(Base):
     event_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     customer_id = Column(UUID(as_uuid=True), ForeignKey('customers.customer_id', ondelete='CASCADE'), nullable=False)
     transaction_id = Column(UUID(as_uuid=True), ForeignKey('transactions.transaction_id', ondelete='SET NULL'))
-    event_type = Column(Enum('high_value_transaction', 'unusual_pattern', 'device_change', 'location_mismatch', 'failed_auth', name='risk_event_enum'), nullable=False)
+    event_type = Column(risk_event_enum, nullable=False)
     description = Column(String)
     created_at = Column(DateTime, default=datetime.now)
-    resolved_at = Column(DateTime)
\ No newline at end of file
+    resolved_at = Column(DateTime)
+
+class RiskEventDailySummary(Base):
+    __tablename__ = 'risk_event_daily_summary'
+    summary_date = Column(Date, primary_key=True)
+    event_type = Column(risk_event_enum, primary_key=True)
+    event_count = Column(Integer, default=0)
+    unresolved_count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.now)
+
+class CustomerRiskDailySummary(Base):
+    __tablename__ = 'customer_risk_daily_summary'
+    customer_id = Column(UUID(as_uuid=True), ForeignKey('customers.customer_id', ondelete='CASCADE'), primary_key=True)
+    summary_date = Column(Date, primary_key=True)
+    event_count = Column(Integer, default=0)
+    unresolved_count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.now)
+
+class CustomerRiskSummary(Base):
+    __tablename__ = 'customer_risk_summary'
+    customer_id = Column(UUID(as_uuid=True), ForeignKey('customers.customer_id', ondelete='CASCADE'), primary_key=True)
+    event_count = Column(Integer, default=0)
+    unresolved_count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.now)
+
+class RiskEventChange(Base):
+    __tablename__ = 'risk_event_changes'
+    summary_date = Column(Date, primary_key=True)
+    changed_at = Column(DateTime, default=datetime.now)
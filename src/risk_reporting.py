@@ -0,0 +1,245 @@
+import sys
+from datetime import datetime, timedelta
+from model import Session, RiskEvent, RiskEventChange, RiskEventDailySummary, CustomerRiskDailySummary, CustomerRiskSummary
+from sqlalchemy import and_, or_, func, case, insert, update, delete, select, literal, DateTime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+LOCK_NAME = 'risk_event_rollups'
+
+def get_date_ranges(dates):
+    # Merge days into contiguous half-open [start, end) ranges so each one is a tight index range scan
+    ranges = []
+    for day in sorted(set(dates)):
+        if ranges and ranges[-1][1] == day:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1)])
+    return [(start, end) for start, end in ranges]
+
+def pop_changed_dates(session):
+    # Days logged by the trg_log_risk_event_* triggers since the last refresh (new, resolved, reopened or deleted events).
+    # The log holds one row per day; rows committed after this statement stay for the next refresh.
+    result = session.execute(delete(RiskEventChange).returning(RiskEventChange.summary_date))
+    return sorted(row[0] for row in result)
+
+def insert_rollups(session, event_filter=None):
+    event_date = func.date(RiskEvent.created_at)
+    unresolved = func.sum(case((RiskEvent.resolved_at == None, 1), else_=0))
+    now = literal(datetime.now(), DateTime)
+
+    by_type = session.query(event_date, RiskEvent.event_type, func.count(), unresolved, now)
+    by_customer = session.query(RiskEvent.customer_id, event_date, func.count(), unresolved, now)
+    if event_filter is not None:
+        by_type = by_type.filter(event_filter)
+        by_customer = by_customer.filter(event_filter)
+
+    session.execute(
+        insert(RiskEventDailySummary).from_select(
+            ['summary_date', 'event_type', 'event_count', 'unresolved_count', 'updated_at'],
+            by_type.group_by(event_date, RiskEvent.event_type)
+        )
+    )
+    session.execute(
+        insert(CustomerRiskDailySummary).from_select(
+            ['customer_id', 'summary_date', 'event_count', 'unresolved_count', 'updated_at'],
+            by_customer.group_by(RiskEvent.customer_id, event_date)
+        )
+    )
+
+def customer_day_totals(dates):
+    # Per-customer sums of customer_risk_daily_summary over the given days
+    return (
+        select(
+            CustomerRiskDailySummary.customer_id,
+            func.sum(CustomerRiskDailySummary.event_count).label('event_count'),
+            func.sum(CustomerRiskDailySummary.unresolved_count).label('unresolved_count'),
+        )
+        .where(CustomerRiskDailySummary.summary_date.in_(dates))
+        .group_by(CustomerRiskDailySummary.customer_id)
+        .subquery()
+    )
+
+def subtract_customer_totals(session, dates):
+    # Take the days' old contribution out of the all-time totals before they are recomputed
+    old = customer_day_totals(dates)
+    session.execute(
+        update(CustomerRiskSummary)
+        .where(CustomerRiskSummary.customer_id == old.c.customer_id)
+        .values(
+            event_count=CustomerRiskSummary.event_count - old.c.event_count,
+            unresolved_count=CustomerRiskSummary.unresolved_count - old.c.unresolved_count,
+            updated_at=datetime.now(),
+        )
+    )
+
+def add_customer_totals(session, dates):
+    new = customer_day_totals(dates)
+    stmt = pg_insert(CustomerRiskSummary).from_select(
+        ['customer_id', 'event_count', 'unresolved_count', 'updated_at'],
+        select(new.c.customer_id, new.c.event_count, new.c.unresolved_count, literal(datetime.now(), DateTime))
+    )
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=['customer_id'],
+            set_={
+                'event_count': CustomerRiskSummary.event_count + stmt.excluded.event_count,
+                'unresolved_count': CustomerRiskSummary.unresolved_count + stmt.excluded.unresolved_count,
+                'updated_at': stmt.excluded.updated_at,
+            },
+        )
+    )
+    # Customers whose remaining events were all deleted
+    session.query(CustomerRiskSummary).filter(CustomerRiskSummary.event_count <= 0).delete(synchronize_session=False)
+
+def rebuild_daily_rollups(session, dates):
+    # Recompute (date, event_type) and (customer_id, date) rows for the given days only,
+    # and apply the difference to the all-time customer totals
+    in_dates = or_(*[
+        and_(RiskEvent.created_at >= start, RiskEvent.created_at < end)
+        for start, end in get_date_ranges(dates)
+    ])
+    subtract_customer_totals(session, dates)
+    session.query(RiskEventDailySummary).filter(RiskEventDailySummary.summary_date.in_(dates)).delete(synchronize_session=False)
+    session.query(CustomerRiskDailySummary).filter(CustomerRiskDailySummary.summary_date.in_(dates)).delete(synchronize_session=False)
+    insert_rollups(session, in_dates)
+    add_customer_totals(session, dates)
+
+def rebuild_all_rollups(session):
+    session.query(RiskEventDailySummary).delete(synchronize_session=False)
+    session.query(CustomerRiskDailySummary).delete(synchronize_session=False)
+    session.query(CustomerRiskSummary).delete(synchronize_session=False)
+    # Events without created_at belong to no day (summary_date is part of the primary key)
+    insert_rollups(session, RiskEvent.created_at != None)
+    session.execute(
+        insert(CustomerRiskSummary).from_select(
+            ['customer_id', 'event_count', 'unresolved_count', 'updated_at'],
+            select(
+                CustomerRiskDailySummary.customer_id,
+                func.sum(CustomerRiskDailySummary.event_count),
+                func.sum(CustomerRiskDailySummary.unresolved_count),
+                literal(datetime.now(), DateTime),
+            ).group_by(CustomerRiskDailySummary.customer_id)
+        )
+    )
+
+def refresh_risk_rollups(session, full=False):
+    print("\n[REPORTING] Refreshing risk_events rollups")
+    # Serialize refreshes (e.g. a manual DAG run overlapping the daily one); released on commit/rollback
+    session.execute(select(func.pg_advisory_xact_lock(func.hashtext(LOCK_NAME))))
+    # Empty rollups mean a fresh database (or one created before the rollups existed)
+    initialized = session.query(RiskEventDailySummary.summary_date).first() is not None
+
+    # The change log is emptied first, so events committed during the rebuild are picked up next time
+    dates = pop_changed_dates(session)
+    if full or not initialized:
+        print("  Full rebuild of all rollups")
+        rebuild_all_rollups(session)
+    elif dates:
+        rebuild_daily_rollups(session, dates)
+        print(f"  Refreshed {len(dates)} day(s)")
+    else:
+        print("  No changes since last refresh")
+
+    session.commit()
+    return dates
+
+# === Query API (reads rollups only, never scans risk_events) ===
+def violations_per_day(session, start_date, end_date, event_type=None):
+    query = (
+        session.query(
+            RiskEventDailySummary.summary_date,
+            func.sum(RiskEventDailySummary.event_count),
+            func.sum(RiskEventDailySummary.unresolved_count),
+        )
+        .filter(RiskEventDailySummary.summary_date.between(start_date, end_date))
+    )
+    if event_type is not None:
+        query = query.filter(RiskEventDailySummary.event_type == event_type)
+    return (
+        query.group_by(RiskEventDailySummary.summary_date)
+        .order_by(RiskEventDailySummary.summary_date)
+        .all()
+    )
+
+def violations_by_event_type(session, start_date, end_date):
+    return (
+        session.query(
+            RiskEventDailySummary.event_type,
+            func.sum(RiskEventDailySummary.event_count),
+            func.sum(RiskEventDailySummary.unresolved_count),
+        )
+        .filter(RiskEventDailySummary.summary_date.between(start_date, end_date))
+        .group_by(RiskEventDailySummary.event_type)
+        .order_by(func.sum(RiskEventDailySummary.event_count).desc())
+        .all()
+    )
+
+def unresolved_counts(session, start_date=None, end_date=None):
+    query = session.query(
+        RiskEventDailySummary.event_type,
+        func.sum(RiskEventDailySummary.unresolved_count),
+    )
+    if start_date is not None:
+        query = query.filter(RiskEventDailySummary.summary_date >= start_date)
+    if end_date is not None:
+        query = query.filter(RiskEventDailySummary.summary_date <= end_date)
+    return query.group_by(RiskEventDailySummary.event_type).all()
+
+def customer_violations(session, customer_id, start_date=None, end_date=None):
+    query = (
+        session.query(
+            CustomerRiskDailySummary.summary_date,
+            CustomerRiskDailySummary.event_count,
+            CustomerRiskDailySummary.unresolved_count,
+        )
+        .filter(CustomerRiskDailySummary.customer_id == customer_id)
+    )
+    if start_date is not None:
+        query = query.filter(CustomerRiskDailySummary.summary_date >= start_date)
+    if end_date is not None:
+        query = query.filter(CustomerRiskDailySummary.summary_date <= end_date)
+    return query.order_by(CustomerRiskDailySummary.summary_date).all()
+
+def top_customers(session, start_date=None, end_date=None, limit=10):
+    # All-time ranking reads customer_risk_summary through its event_count index.
+    # A date range has to aggregate every (customer_id, day) row in the range, so it grows with active customers x days.
+    if start_date is None and end_date is None:
+        return (
+            session.query(
+                CustomerRiskSummary.customer_id,
+                CustomerRiskSummary.event_count,
+                CustomerRiskSummary.unresolved_count,
+            )
+            .order_by(CustomerRiskSummary.event_count.desc())
+            .limit(limit)
+            .all()
+        )
+
+    total = func.sum(CustomerRiskDailySummary.event_count)
+    query = session.query(
+        CustomerRiskDailySummary.customer_id,
+        total,
+        func.sum(CustomerRiskDailySummary.unresolved_count),
+    )
+    if start_date is not None:
+        query = query.filter(CustomerRiskDailySummary.summary_date >= start_date)
+    if end_date is not None:
+        query = query.filter(CustomerRiskDailySummary.summary_date <= end_date)
+    return (
+        query.group_by(CustomerRiskDailySummary.customer_id)
+        .order_by(total.desc())
+        .limit(limit)
+        .all()
+    )
+
+def main():
+    session = Session()
+    refresh_risk_rollups(session, full='--full' in sys.argv)
+    today = datetime.now().date()
+    print("\n[REPORT] Violations by event type (last 7 days)")
+    for event_type, count, unresolved in violations_by_event_type(session, today - timedelta(days=6), today):
+        print(f"  {event_type}: {count} events, {unresolved} unresolved")
+    session.close()
+
+if __name__ == '__main__':
+    main()